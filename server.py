@@ -1,17 +1,45 @@
 import os
+import atexit
+import gzip
 import json
+import queue
+import secrets
+import sqlite3
 import threading
+import time
 import traceback
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from uuid import uuid4
+from functools import lru_cache
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, send_from_directory, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# -----------------------------------------------------------------------
+# ⚡ JSON 직렬화 (orjson 우선, 없으면 표준 json으로 fallback)
+# 두 경우 모두 UTF-8 bytes를 주고받는다. HTTP 요청 본문과 응답 파싱(OpenAI, Supabase)도 이것을 쓴다.
+# -----------------------------------------------------------------------
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 # -----------------------------------------------------------------------
 # 📋 로깅 설정
@@ -25,6 +53,31 @@ logger = logging.getLogger(__name__)
 
 OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# (connect, read) 타임아웃: 연결은 빨리 포기하고, 응답 생성은 충분히 기다린다
+OPENAI_TIMEOUT = (5, 90)
+# 이 프로세스에서 동시에 보낼 수 있는 OpenAI 요청 수 상한 (배치/단건/스트리밍 공통).
+# 요청이 몰려도 요금제의 분당 요청·토큰 한도를 넘지 않도록 조절한다.
+OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "16"))
+_openai_slots = threading.BoundedSemaphore(OPENAI_CONCURRENCY)
+
+# OpenAI 호출용 세션: TCP/TLS 연결을 재사용하고, 일시적인 오류(429/5xx)는 짧게 재시도한다.
+# 기본 Retry는 POST를 재시도하지 않으므로 allowed_methods에 명시한다.
+# 풀 크기가 동시 요청 수보다 작으면 넘치는 연결은 쓰고 나서 닫혀 다음 요청이 TLS 핸드셰이크를 다시 하므로,
+# 항상 OPENAI_CONCURRENCY개 이상의 연결을 유지한다.
+_openai_session = requests.Session()
+_openai_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=max(32, OPENAI_CONCURRENCY),
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"POST"}),
+        ),
+    ),
+)
 
 # -----------------------------------------------------------------------
 # 🗄️ Supabase 설정
@@ -33,14 +86,50 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 SUPABASE_URL = os.getenv("SUPABASE_URL", "").rstrip("/")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 
+# Supabase 호출용 세션: OpenAI와 마찬가지로 TCP/TLS 연결을 재사용한다.
+# 재시도는 Retry 기본값대로 GET 같은 멱등 요청에만 적용한다 (insert POST를 재시도하면 중복 저장될 수 있음).
+_supabase_session = requests.Session()
+_supabase_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]),
+    ),
+)
+
 # 교과 성취 기준 파일 경로
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STANDARD_PATH = os.path.join(BASE_DIR, "S1_초등_5_국어_TXT_012230.json")
 
 # -----------------------------------------------------------------------
-# 🔒 로컬 파일 저장용 Lock (로컬 개발 fallback)
+# 🔒 로컬 SQLite 저장용 Lock (로컬 개발 fallback)
+# 쓰기용 연결 하나를 여러 스레드가 나눠 쓰므로 그 연결을 쓰는 동안에는 항상 이 Lock을 잡는다.
+# 전체 조회는 WAL 모드의 조회 전용 연결(_read_conns 풀)로 하므로 이 Lock을 기다리지 않는다.
 # -----------------------------------------------------------------------
 _schema_lock = threading.Lock()
+_db_conn = None
+_read_conns = queue.LifoQueue()
+
+# essays 테이블 전체 조회 결과 캐시 (essays_revision.rev가 바뀔 때만 다시 읽음)
+# rev는 어느 프로세스든 essays를 바꾸는 트랜잭션마다 1씩 올라가므로 캐시의 version과 같으면 최신이다.
+# 이 프로세스가 쓴 변경은 쓰는 쪽에서 직접 캐시에 반영하고 version도 함께 올린다.
+# rows에는 글마다 DB에 저장된 JSON bytes를 그대로 두고, body는 그것을 이어 붙인 GET 응답 본문이다.
+# 그래서 조회할 때 JSON을 파싱하거나 다시 직렬화하지 않는다.
+# 캐시된 리스트는 공유되므로 직접 수정하지 말고 _cache_lock 안에서 사본으로 교체한다.
+_SCHEMA_CACHE = {"version": None, "rows": None, "index": {}, "body": None}
+_cache_lock = threading.Lock()
+
+# -----------------------------------------------------------------------
+# 🧵 백그라운드 AI 분석 작업 풀
+# 제출마다 스레드를 새로 만들지 않고, 동시에 도는 분석 작업 수를 AI_WORKERS로 제한한다.
+# 풀이 꽉 차면 나머지 제출은 큐에서 차례를 기다린다.
+# -----------------------------------------------------------------------
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AI_WORKERS", "8")),
+    thread_name_prefix="essay-ai",
+)
+atexit.register(_executor.shutdown, wait=False)
 
 
 # -----------------------------------------------------------------------
@@ -66,17 +155,17 @@ def _supabase_insert(essay_data: dict) -> dict:
         "process_id": essay_data["process"]["process_id"],
         "data": essay_data,  # JSONB 컬럼에 전체 스키마 저장
     }
-    resp = requests.post(url, headers=_supabase_headers(), json=payload, timeout=30)
+    resp = _supabase_session.post(url, headers=_supabase_headers(), data=_dumps(payload), timeout=30)
     resp.raise_for_status()
-    return resp.json()
+    return _loads(resp.content)
 
 
 def _supabase_select_all() -> list:
     """essays 테이블 전체 조회 (최신순)"""
     url = f"{SUPABASE_URL}/rest/v1/essays?order=created_at.desc&select=data"
-    resp = requests.get(url, headers=_supabase_headers(), timeout=30)
+    resp = _supabase_session.get(url, headers=_supabase_headers(), timeout=30)
     resp.raise_for_status()
-    rows = resp.json()
+    rows = _loads(resp.content)
     return [row["data"] for row in rows if row.get("data")]
 
 
@@ -84,141 +173,573 @@ def _supabase_update(process_id: str, essay_data: dict) -> None:
     """process_id로 특정 레코드 업데이트"""
     url = f"{SUPABASE_URL}/rest/v1/essays?process_id=eq.{process_id}"
     payload = {"data": essay_data}
-    resp = requests.patch(url, headers=_supabase_headers(), json=payload, timeout=30)
+    resp = _supabase_session.patch(url, headers=_supabase_headers(), data=_dumps(payload), timeout=30)
     resp.raise_for_status()
 
 
 # -----------------------------------------------------------------------
-# 📦 로컬 파일 fallback 헬퍼
+# 📦 로컬 SQLite fallback 헬퍼
+# Supabase essays 테이블과 같은 모양(process_id, data, created_at)으로 essays.db에 저장한다.
+# 글 하나를 추가/수정할 때 해당 행만 쓰고, process_id 조회는 기본 키 인덱스를 탄다.
+# data는 _dumps가 만든 UTF-8 bytes를 TEXT로 CAST해 저장한다 (SQLite JSON 함수로 다룰 수 있도록).
 # -----------------------------------------------------------------------
-def get_schema_path() -> str:
-    primary = os.path.join(BASE_DIR, "schema.json")
-    try:
-        with open(primary, "a", encoding="utf-8"):
-            pass
+# 다른 프로세스가 쓰기 잠금을 잡고 있을 때 기다릴 최대 시간(초)
+DB_BUSY_TIMEOUT = 10.0
+
+
+def _resolve_db_path() -> str:
+    """프로젝트 폴더에 쓸 수 있으면 그곳에, 아니면(Vercel 등 읽기 전용) /tmp에 DB를 둔다"""
+    primary = os.path.join(BASE_DIR, "essays.db")
+    if os.access(BASE_DIR, os.W_OK) and (not os.path.exists(primary) or os.access(primary, os.W_OK)):
         return primary
-    except OSError:
-        return "/tmp/schema.json"
+    return "/tmp/essays.db"
+
 
+# 쓰기 가능 여부는 실행 중에 바뀌지 않으므로 import 시점에 한 번만 판단한다
+DB_PATH = _resolve_db_path()
 
-def _read_essays_locked(out_path: str) -> list:
-    if not os.path.exists(out_path):
-        return []
+
+def _connect_db() -> sqlite3.Connection:
+    return sqlite3.connect(
+        DB_PATH,
+        timeout=DB_BUSY_TIMEOUT,
+        check_same_thread=False,
+        isolation_level=None,
+    )
+
+
+def _get_db_locked() -> sqlite3.Connection:
+    """_schema_lock 안에서 호출. 처음 호출될 때 쓰기용 연결을 열고 테이블을 준비한다"""
+    global _db_conn
+    if _db_conn is None:
+        conn = _connect_db()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS essays ("
+            " process_id TEXT PRIMARY KEY,"
+            " created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),"
+            " data TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS essays_created_at ON essays (created_at)")
+        # 프로세스 간에 공유되는 변경 카운터 (PRAGMA data_version은 연결마다 따로라 여러 연결에서 비교할 수 없음)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS essays_revision ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " rev INTEGER NOT NULL)"
+        )
+        conn.execute("INSERT OR IGNORE INTO essays_revision (id, rev) VALUES (0, 0)")
+        _import_legacy_files(conn)
+        logger.info(f"[로컬 DB] {DB_PATH}")
+        _db_conn = conn
+    return _db_conn
+
+
+def _parse_legacy_file(path: str) -> list:
+    """예전 저장 형식(schema.json 배열, schema.jsonl 한 줄에 한 건)을 읽는다"""
+    with open(path, "rb") as f:
+        raw = f.read()
     try:
-        with open(out_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _loads(raw)
         return data if isinstance(data, list) else [data]
-    except Exception as e:
-        logger.error(f"schema.json 읽기 실패: {e}")
-        return []
+    except ValueError:
+        pass
+    essays = []
+    for line_no, line in enumerate(raw.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            essays.append(_loads(line))
+        except ValueError as e:
+            logger.error(f"{path} {line_no}번째 줄 파싱 실패 (건너뜀): {e}")
+    return essays
+
+
+def _import_legacy_files(conn: sqlite3.Connection) -> None:
+    """DB가 비어 있고 예전 schema.jsonl / schema.json이 남아 있으면 한 번만 옮겨 담는다"""
+    if conn.execute("SELECT 1 FROM essays LIMIT 1").fetchone():
+        return
+    for name in ("schema.jsonl", "schema.json"):
+        legacy_path = os.path.join(BASE_DIR, name)
+        if not os.path.exists(legacy_path):
+            continue
+        try:
+            essays = _parse_legacy_file(legacy_path)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO essays (process_id, data) VALUES (?, CAST(? AS TEXT))",
+                [(e["process"]["process_id"], _dumps(e)) for e in essays],
+            )
+            _bump_revision(conn)
+            conn.execute("COMMIT")
+            logger.info(f"[마이그레이션] {legacy_path} → essays.db ({len(essays)}건)")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"{name} 마이그레이션 실패: {e}")
+        return
+
+
+def _current_revision(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT rev FROM essays_revision").fetchone()[0]
+
+
+def _bump_revision(conn: sqlite3.Connection) -> None:
+    """essays를 바꾸는 쓰기 트랜잭션 안에서, 커밋 직전에 호출"""
+    conn.execute("UPDATE essays_revision SET rev = rev + 1")
+
+
+@contextmanager
+def _read_conn():
+    """조회 전용 연결을 풀에서 빌려준다. 동시에 조회하는 수만큼만 연결이 생긴다"""
+    try:
+        conn = _read_conns.get_nowait()
+    except queue.Empty:
+        with _schema_lock:
+            _get_db_locked()  # 테이블이 준비된 뒤에 연다
+        conn = _connect_db()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        _read_conns.put(conn)
+
+
+def _join_essays_body(rows: list) -> bytes:
+    """글마다 인코딩된 JSON bytes로 {"essays": [...]} 응답 본문을 만든다"""
+    return b'{"essays":[' + b",".join(rows) + b"]}"
+
+
+def _read_essays_body() -> bytes:
+    """
+    _schema_lock 없이 조회 전용 연결로 읽는다 (WAL 모드라 쓰기 중에도 조회가 막히지 않음).
+    rev가 캐시와 같으면 캐시된 응답 본문을 그대로 반환.
+    """
+    with _read_conn() as conn:
+        revision = _current_revision(conn)
+        with _cache_lock:
+            if _SCHEMA_CACHE["rows"] is not None and _SCHEMA_CACHE["version"] == revision:
+                if _SCHEMA_CACHE["body"] is None:
+                    _SCHEMA_CACHE["body"] = _join_essays_body(_SCHEMA_CACHE["rows"])
+                return _SCHEMA_CACHE["body"]
+        # rev와 행 목록을 같은 읽기 트랜잭션(같은 스냅샷)에서 읽는다.
+        # data는 이미 JSON 텍스트이므로 BLOB으로 받아 파싱 없이 쓴다.
+        conn.execute("BEGIN")
+        revision = _current_revision(conn)
+        rows = conn.execute(
+            "SELECT process_id, CAST(data AS BLOB) FROM essays ORDER BY created_at, rowid"
+        ).fetchall()
+        conn.execute("COMMIT")
+    encoded = [data for _, data in rows]
+    body = _join_essays_body(encoded)
+    with _cache_lock:
+        # 동시에 다시 읽은 다른 요청이 더 최신 스냅샷을 넣어 뒀으면 덮어쓰지 않는다
+        if _SCHEMA_CACHE["version"] is None or _SCHEMA_CACHE["version"] <= revision:
+            _SCHEMA_CACHE.update(
+                version=revision,
+                rows=encoded,
+                index={process_id: i for i, (process_id, _) in enumerate(rows)},
+                body=body,
+            )
+    return body
+
+
+def _insert_essays_locked(schemas: list) -> list:
+    """
+    _schema_lock 안에서 호출. 여러 글을 한 트랜잭션으로 넣는다.
+    글마다 savepoint를 두어 한 편이 실패해도(예: process_id 중복) 나머지는 저장된다.
+    입력 순서대로 성공이면 None, 실패면 그 예외를 담은 목록을 반환.
+    """
+    conn = _get_db_locked()
+    errors = []
+    inserted = []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        base_revision = _current_revision(conn)
+        for schema in schemas:
+            conn.execute("SAVEPOINT essay_insert")
+            process_id = schema["process"]["process_id"]
+            data = _dumps(schema)
+            try:
+                conn.execute(
+                    "INSERT INTO essays (process_id, data) VALUES (?, CAST(? AS TEXT))",
+                    (process_id, data),
+                )
+            except Exception as e:
+                conn.execute("ROLLBACK TO essay_insert")
+                errors.append(e)
+            else:
+                inserted.append((process_id, data))
+                errors.append(None)
+            conn.execute("RELEASE essay_insert")
+        if inserted:
+            _bump_revision(conn)
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    if inserted:
+        with _cache_lock:
+            # 캐시가 이 트랜잭션 직전 상태일 때만 이어 붙인다. 아니면 다음 조회가 다시 읽는다
+            if _SCHEMA_CACHE["rows"] is not None and _SCHEMA_CACHE["version"] == base_revision:
+                rows = _SCHEMA_CACHE["rows"]
+                index = dict(_SCHEMA_CACHE["index"])
+                for offset, (process_id, _) in enumerate(inserted):
+                    index[process_id] = len(rows) + offset
+                _SCHEMA_CACHE.update(
+                    version=base_revision + 1,
+                    rows=rows + [data for _, data in inserted],
+                    index=index,
+                    body=None,
+                )
+    return errors
+
 
+def _collect_batch(source: queue.Queue, max_size: int, max_delay: float) -> list:
+    """큐에서 하나가 올 때까지 기다린 뒤, max_delay 동안 최대 max_size개까지 더 모은다"""
+    batch = [source.get()]
+    deadline = time.monotonic() + max_delay
+    while len(batch) < max_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(source.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+# -----------------------------------------------------------------------
+# 🧺 로컬 DB 그룹 커밋
+# 백그라운드 작업들이 거의 동시에 끝나면(특히 배치 평가 결과) 글마다 따로 커밋하지 않고
+# 전용 writer 스레드가 큐에 쌓여 있는 글을 최대 WRITE_MAX_BATCH건까지 모아 한 번에 커밋한다.
+# 따로 기다리지 않으므로 혼자 들어온 글은 바로 커밋되고, 커밋하는 동안 들어온 글은 다음 트랜잭션에 묶인다.
+# -----------------------------------------------------------------------
+WRITE_MAX_BATCH = 32
+
+
+class _GroupCommitWriter:
+    """insert()는 자기 글이 포함된 트랜잭션이 커밋될 때까지 기다렸다가 반환한다"""
+
+    def __init__(self, max_batch: int):
+        self._max_batch = max_batch
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._started = False
+
+    def insert(self, schema: dict) -> None:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((schema, future))
+        future.result()
+
+    def _ensure_started(self) -> None:
+        # _BatchDispatcher와 같은 이유로 첫 요청 때 스레드를 띄운다
+        if self._started:
+            return
+        with self._start_lock:
+            if not self._started:
+                threading.Thread(target=self._write_loop, name="essay-writer", daemon=True).start()
+                self._started = True
+
+    def _take_queued(self) -> list:
+        """하나가 올 때까지 기다린 뒤, 이미 큐에 쌓여 있는 것만 max_batch개까지 더 가져온다"""
+        batch = [self._queue.get()]
+        while len(batch) < self._max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = self._take_queued()
+            try:
+                with _schema_lock:
+                    errors = _insert_essays_locked([schema for schema, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), error in zip(batch, errors):
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
 
-def _write_essays_locked(out_path: str, essays: list) -> None:
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(essays, f, ensure_ascii=False, indent=2)
+
+_writer = _GroupCommitWriter(WRITE_MAX_BATCH)
+
+
+def _select_essay_fields_locked(process_id: str, *json_paths: str):
+    """
+    _schema_lock 안에서 호출. 행 전체를 Python으로 읽지 않고 필요한 JSON 필드만 꺼낸다.
+    해당 글이 없으면 None, 있으면 json_paths 순서대로 값을 담은 튜플을 반환.
+    """
+    conn = _get_db_locked()
+    columns = ", ".join("json_extract(data, ?)" for _ in json_paths)
+    return conn.execute(
+        f"SELECT {columns} FROM essays WHERE process_id = ?",
+        (*json_paths, process_id),
+    ).fetchone()
+
+
+def _patch_essay_locked(process_id: str, patch: dict) -> bool:
+    """
+    _schema_lock 안에서 호출. JSON Merge Patch(patch)를 SQLite json_patch로 해당 행에 적용한다.
+    바뀌는 필드만 담은 patch를 보내므로 행 전체를 읽고 다시 직렬화하지 않으며,
+    UPDATE 한 문장이라 다른 프로세스의 변경과 겹쳐도 덮어써져 사라지지 않는다.
+    해당 글이 없으면 False.
+    """
+    conn = _get_db_locked()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        base_revision = _current_revision(conn)
+        cursor = conn.execute(
+            "UPDATE essays SET data = json_patch(data, CAST(? AS TEXT)) WHERE process_id = ?",
+            (_dumps(patch), process_id),
+        )
+        found = cursor.rowcount > 0
+        if found:
+            _bump_revision(conn)
+            # 캐시에 넣을 바뀐 행 (json_patch 결과를 Python에서 다시 만들지 않고 그대로 받는다)
+            (patched,) = conn.execute(
+                "SELECT CAST(data AS BLOB) FROM essays WHERE process_id = ?", (process_id,)
+            ).fetchone()
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    if not found:
+        return False
+    with _cache_lock:
+        if _SCHEMA_CACHE["version"] == base_revision and process_id in _SCHEMA_CACHE["index"]:
+            rows = list(_SCHEMA_CACHE["rows"])
+            rows[_SCHEMA_CACHE["index"][process_id]] = patched
+            _SCHEMA_CACHE.update(version=base_revision + 1, rows=rows, body=None)
+    return True
 
 
 def _append_essay_safe(schema: dict) -> None:
     """
     Supabase가 설정돼 있으면 Supabase에 저장,
-    아니면 로컬 schema.json에 저장 (개발 환경 fallback).
+    아니면 로컬 essays.db에 저장 (개발 환경 fallback).
     """
     if _is_supabase_configured():
         _supabase_insert(schema)
         logger.info(f"[Supabase 저장] process_id={schema['process']['process_id']}")
     else:
-        out_path = get_schema_path()
-        with _schema_lock:
-            essays = _read_essays_locked(out_path)
-            essays.append(schema)
-            _write_essays_locked(out_path, essays)
-        logger.info(f"[로컬 저장] process_id={schema['process']['process_id']} → {out_path}")
+        _writer.insert(schema)
+        logger.info(f"[로컬 저장] process_id={schema['process']['process_id']}")
+
+
+class _OrjsonProvider(JSONProvider):
+    """jsonify(), request.get_json() 등 Flask 내부 JSON 처리도 _dumps/_loads(orjson)를 쓰게 한다"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return _dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return _loads(s)
 
 
 app = Flask(__name__)
+app.json = _OrjsonProvider(app)
 CORS(app)
 
 
+# 이보다 작은 응답은 gzip으로 얻는 이득보다 헤더/CPU 비용이 커서 압축하지 않는다
+GZIP_MIN_BYTES = 1024
+
+
+def ojsonify(obj, status: int = 200, compress: bool = False) -> Response:
+    """jsonify 대신 _dumps(orjson)로 바로 bytes 응답을 만든다"""
+    return _json_response(_dumps(obj), status, compress)
+
+
+def _json_response(body: bytes, status: int = 200, compress: bool = False) -> Response:
+    """
+    이미 JSON으로 인코딩된 body로 응답을 만든다.
+    compress=True이고 클라이언트가 gzip을 받으면 level 1로 압축한다 (CPU 비용이 거의 없음).
+    """
+    resp = Response(body, status=status, mimetype="application/json")
+    if compress:
+        resp.vary.add("Accept-Encoding")
+        if len(body) >= GZIP_MIN_BYTES and request.accept_encodings["gzip"] > 0:
+            resp.set_data(gzip.compress(body, compresslevel=1, mtime=0))
+            resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
+
 def load_achievement_standard_and_desc(standard_json_path: str):
-    with open(standard_json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(standard_json_path, "rb") as f:
+        data = _loads(f.read())
     standards = data.get("source_data_info", {}).get("2015_achievement_standard", [])
     achievement_2015 = " ".join(standards) if standards else ""
     text_description = data.get("learning_data_info", {}).get("text_description", "")
     return achievement_2015, text_description
 
 
+# 성취 기준 파일은 배포물에 포함된 정적 파일이고 실행 중에 바뀌지 않으므로 import 시점에 한 번만 읽는다
+ACHIEVEMENT_2015, TEXT_DESCRIPTION = load_achievement_standard_and_desc(STANDARD_PATH)
+
+
 def _strip_json_markdown(content: str) -> str:
+    """```json ... ``` 코드 블록으로 감싼 응답이면 여는 줄과 닫는 ```만 잘라낸다 (줄 목록을 만들지 않음)"""
     content = content.strip()
     if content.startswith("```"):
-        lines = content.splitlines()
-        if lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        content = "\n".join(lines).strip()
+        newline = content.find("\n")
+        content = content[newline + 1:] if newline != -1 else content[3:]
+        content = content.removesuffix("```").strip()
     return content
 
 
-def call_openai_for_feedback(student_text: str, achievement_2015: str, text_description: str):
-    if not OPENAI_API_KEY:
-        raise RuntimeError("OPENAI_API_KEY 환경변수가 설정되어 있지 않습니다.")
+# 모델이 글 한 편마다 돌려줘야 하는 JSON 객체 형식 (단건/배치 프롬프트 공통)
+_FEEDBACK_JSON_FORMAT = (
+    "{\n"
+    '  \"feedback\": \"3단 구성 피드백 (각 문단 최소 2문장, 전체 6문장 이상):\\n'
+    '    ① 따뜻한 공감과 격려 (2문장 이상)\\n'
+    '    ② 성취기준 기반의 구체적인 어휘/문법 조언 (2문장 이상)\\n'
+    '    ③ 아이의 생각을 넓혀주는 심화 질문 (2문장 이상)\",\n'
+    '  \"achievement_explanation\": \"성취기준 [6국01-07]을 인용하며 왜 이런 피드백이 나왔는지 교사가 납득할 수 있는 상세한 근거 설명\",\n'
+    '  \"revised_text\": \"학생 원문을 더 매끄럽고 수준 높게 다듬은 AI 추천 수정본 (전체 텍스트)\",\n'
+    '  \"scores\": {\n'
+    '    \"vocabulary\": 1-5 정수,\n'
+    '    \"grammar\": 1-5 정수,\n'
+    '    \"logic\": 1-5 정수,\n'
+    '    \"empathy\": 1-5 정수\n'
+    "  }\n"
+    "}\n"
+)
+
+_FEEDBACK_REQUIREMENTS = (
+    "요구사항:\n"
+    "1. feedback은 반드시 3단 구성으로 작성 (각 문단 최소 2문장, 전체 6문장 이상)\n"
+    "2. achievement_explanation은 성취기준을 명시적으로 인용하며 상세히 설명\n"
+    "3. revised_text는 학생 원문의 의미를 유지하면서 더 매끄럽고 수준 높게 다듬은 전체 텍스트\n"
+)
 
-    system_prompt = (
+# user 프롬프트 틀. 요청마다 바뀌는 부분(지문 설명, 학생 글, 편 수)만 format으로 채운다
+_SINGLE_USER_PROMPT = (
+    "지문의 주제와 성취 기준을 참고하여 학생 글을 평가하세요.\n\n"
+    "지문 설명: {text_description}\n\n"
+    "학생 글:\n\"\"\"\n{student_text}\n\"\"\"\n\n"
+    + _FEEDBACK_REQUIREMENTS
+).format
+
+_BATCH_USER_PROMPT = (
+    "지문의 주제와 성취 기준을 참고하여 학생 글 {count}편을 각각 평가하세요.\n\n"
+    "지문 설명: {text_description}\n\n"
+    "{essays_block}"
+    + _FEEDBACK_REQUIREMENTS
+    + "4. results 배열의 원소 수는 반드시 {count}개이며, 각 원소의 index는 그 원소가 평가한 학생 글의 번호(1~{count})여야 함\n"
+).format
+
+_BATCH_ESSAY_ITEM = "학생 글 {}:\n\"\"\"\n{}\n\"\"\"\n\n".format
+
+# 요청마다 같은 헤더와 payload 항목은 미리 만들어 둔다
+_OPENAI_HEADERS = {
+    "Content-Type": "application/json",
+    "Authorization": f"Bearer {OPENAI_API_KEY}",
+}
+_CHAT_PAYLOAD_BASE = {
+    "model": "gpt-4o-mini",
+    "temperature": 0.7,
+    # JSON 모드: 모델이 항상 파싱 가능한 JSON 객체 하나를 돌려주도록 강제한다
+    "response_format": {"type": "json_object"},
+    "stream": True,
+}
+
+# 글 한 편당 출력 토큰 상한, 배치 요청 전체 상한 (gpt-4o-mini 최대 출력 16,384 토큰)
+_MAX_TOKENS_PER_ESSAY = 2000
+_MAX_TOKENS_PER_REQUEST = 16000
+
+
+def _system_prompt_head(achievement_2015: str) -> str:
+    return (
         "당신은 초등학교 5학년 국어 수업을 돕는 전문적인 AI 보조교사입니다. "
         "다음 성취 기준을 정확히 이해하고 학생 글을 평가하세요.\n\n"
         f"- 성취 기준: {achievement_2015}\n\n"
-        "출력은 반드시 아래 JSON 형식의 한 개 객체로만 답하세요. "
-        "절대 마크다운 코드블록(```json)으로 감싸지 마세요.\n"
-        "{\n"
-        '  \"feedback\": \"3단 구성 피드백 (각 문단 최소 2문장, 전체 6문장 이상):\\n'
-        '    ① 따뜻한 공감과 격려 (2문장 이상)\\n'
-        '    ② 성취기준 기반의 구체적인 어휘/문법 조언 (2문장 이상)\\n'
-        '    ③ 아이의 생각을 넓혀주는 심화 질문 (2문장 이상)\",\n'
-        '  \"achievement_explanation\": \"성취기준 [6국01-07]을 인용하며 왜 이런 피드백이 나왔는지 교사가 납득할 수 있는 상세한 근거 설명\",\n'
-        '  \"revised_text\": \"학생 원문을 더 매끄럽고 수준 높게 다듬은 AI 추천 수정본 (전체 텍스트)\",\n'
-        '  \"scores\": {\n'
-        '    \"vocabulary\": 1-5 정수,\n'
-        '    \"grammar\": 1-5 정수,\n'
-        '    \"logic\": 1-5 정수,\n'
-        '    \"empathy\": 1-5 정수\n'
-        "  }\n"
-        "}\n"
     )
 
-    user_prompt = (
-        "지문의 주제와 성취 기준을 참고하여 학생 글을 평가하세요.\n\n"
-        f"지문 설명: {text_description}\n\n"
-        f"학생 글:\n\"\"\"\n{student_text}\n\"\"\"\n\n"
-        "요구사항:\n"
-        "1. feedback은 반드시 3단 구성으로 작성 (각 문단 최소 2문장, 전체 6문장 이상)\n"
-        "2. achievement_explanation은 성취기준을 명시적으로 인용하며 상세히 설명\n"
-        "3. revised_text는 학생 원문의 의미를 유지하면서 더 매끄럽고 수준 높게 다듬은 전체 텍스트\n"
-        "4. 반드시 순수 JSON만 출력할 것. ```json 코드블록 사용 금지.\n"
+
+# 시스템 프롬프트는 성취 기준에만 의존하므로 성취 기준별로 한 번만 만든다.
+# 글마다 바뀌는 내용은 user 프롬프트에만 넣는다.
+@lru_cache(maxsize=4)
+def _single_system_prompt(achievement_2015: str) -> str:
+    return (
+        _system_prompt_head(achievement_2015)
+        + "출력은 아래 JSON 형식의 객체 하나입니다.\n"
+        + _FEEDBACK_JSON_FORMAT
     )
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-    }
+
+@lru_cache(maxsize=4)
+def _batch_system_prompt(achievement_2015: str) -> str:
+    return (
+        _system_prompt_head(achievement_2015)
+        + "학생 글 여러 편이 번호와 함께 주어집니다. 각 글을 서로 독립적으로 평가하세요. "
+        '출력은 {"results": [...]} 형태의 JSON 객체 하나이며, '
+        "results 배열에는 아래 형식의 객체를 입력 순서대로 하나씩 담되, "
+        '각 객체에 평가한 학생 글의 번호를 "index"(정수) 필드로 함께 넣습니다.\n'
+        + _FEEDBACK_JSON_FORMAT
+    )
+
+
+def _iter_chat_completion(system_prompt: str, user_prompt: str, max_tokens: int):
+    """Chat Completions API를 스트리밍으로 호출하고, 응답 본문(content) 조각을 도착하는 대로 yield"""
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY 환경변수가 설정되어 있지 않습니다.")
+
     payload = {
-        "model": "gpt-4o-mini",
+        **_CHAT_PAYLOAD_BASE,
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
-        "temperature": 0.7,
-        "max_tokens": 2000,
+        "max_tokens": max_tokens,
     }
 
-    resp = requests.post(OPENAI_API_URL, headers=headers, json=payload, timeout=90)
-    resp.raise_for_status()
-    data = resp.json()
-    raw_content = data["choices"][0]["message"]["content"].strip()
-
+    # 스트리밍 응답(SSE)은 이벤트 하나가 한 줄("data: {...}")이므로 줄 단위로 받아 파싱한다.
+    # iter_lines가 네트워크 청크 경계에서 잘린 줄을 이어 붙여 주므로 JSON이 중간에 끊기지 않는다.
+    # 동시에 진행 중인 OpenAI 요청이 OPENAI_CONCURRENCY개면 빈자리가 날 때까지 기다린다
+    with _openai_slots:
+        with _openai_session.post(
+            OPENAI_API_URL, headers=_OPENAI_HEADERS, data=_dumps(payload), timeout=OPENAI_TIMEOUT, stream=True
+        ) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if not line.startswith(b"data: "):
+                    continue
+                data = line[len(b"data: "):]
+                if data == b"[DONE]":
+                    break
+                # 본문 조각이 없는 이벤트는 파싱하지 않고 건너뛴다 (max_tokens에서 잘렸다는 finish_reason은 확인한다)
+                if b'"content"' not in data and b'"length"' not in data:
+                    continue
+                for choice in _loads(data).get("choices", []):
+                    if choice.get("finish_reason") == "length":
+                        # 잘린 JSON은 어차피 파싱에 실패하므로 원인을 분명히 알린다
+                        raise RuntimeError(f"모델 응답이 max_tokens({max_tokens})에서 잘렸습니다.")
+                    content = choice.get("delta", {}).get("content")
+                    if content:
+                        yield content
+
+
+def _request_chat_completion(system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+    """_iter_chat_completion의 조각을 다 모은 응답 본문(content) 문자열을 반환"""
+    return "".join(_iter_chat_completion(system_prompt, user_prompt, max_tokens)).strip()
+
+
+def _parse_model_json(raw_content: str):
     content = _strip_json_markdown(raw_content)
     try:
-        parsed = json.loads(content)
+        return _loads(content)
     except json.JSONDecodeError as e:
         logger.error(
             "OpenAI 응답 JSON 파싱 실패\n"
@@ -227,6 +748,8 @@ def call_openai_for_feedback(student_text: str, achievement_2015: str, text_desc
         )
         raise RuntimeError(f"모델 응답을 JSON으로 파싱하지 못했습니다: {e}") from e
 
+
+def _unpack_feedback(parsed: dict):
     feedback_text = parsed.get("feedback", "").strip()
     achievement_explanation = parsed.get("achievement_explanation", "").strip()
     revised_text = parsed.get("revised_text", "").strip()
@@ -234,6 +757,140 @@ def call_openai_for_feedback(student_text: str, achievement_2015: str, text_desc
     return feedback_text, achievement_explanation, revised_text, scores
 
 
+def call_openai_for_feedback(student_text: str, achievement_2015: str, text_description: str):
+    system_prompt = _single_system_prompt(achievement_2015)
+    user_prompt = _SINGLE_USER_PROMPT(student_text=student_text, text_description=text_description)
+
+    raw_content = _request_chat_completion(system_prompt, user_prompt, _MAX_TOKENS_PER_ESSAY)
+    return _unpack_feedback(_parse_model_json(raw_content))
+
+
+def call_openai_for_feedback_batch(student_texts: list, achievement_2015: str, text_description: str) -> list:
+    """여러 편의 글을 OpenAI 요청 한 번으로 평가. 입력 순서대로 call_openai_for_feedback과 같은 튜플 목록을 반환"""
+    if len(student_texts) == 1:
+        return [call_openai_for_feedback(student_texts[0], achievement_2015, text_description)]
+
+    count = len(student_texts)
+    system_prompt = _batch_system_prompt(achievement_2015)
+
+    user_prompt = _BATCH_USER_PROMPT(
+        count=count,
+        text_description=text_description,
+        essays_block="".join(_BATCH_ESSAY_ITEM(i, text) for i, text in enumerate(student_texts, 1)),
+    )
+
+    max_tokens = min(_MAX_TOKENS_PER_ESSAY * count, _MAX_TOKENS_PER_REQUEST)
+    parsed = _parse_model_json(_request_chat_completion(system_prompt, user_prompt, max_tokens))
+    results = parsed.get("results") if isinstance(parsed, dict) else None
+    if not isinstance(results, list) or len(results) != count:
+        got = len(results) if isinstance(results, list) else type(results).__name__
+        raise RuntimeError(f"배치 응답 개수가 맞지 않습니다: 기대 {count}개, 실제 {got}")
+    # 결과는 위치가 아니라 index로 글에 짝짓는다. 모델이 순서를 바꾸거나 합쳐도 다른 학생 글에 저장되지 않도록
+    # index가 1..count를 정확히 한 번씩 덮지 않으면 실패로 본다 (dispatcher가 글마다 다시 요청함).
+    by_index = {item.get("index"): item for item in results if isinstance(item, dict)}
+    if set(by_index) != set(range(1, count + 1)):
+        raise RuntimeError(f"배치 응답 index가 1~{count}와 맞지 않습니다: {list(by_index)}")
+    return [_unpack_feedback(by_index[i]) for i in range(1, count + 1)]
+
+
+# -----------------------------------------------------------------------
+# 📮 OpenAI 마이크로 배칭
+# 짧은 시간(BATCH_MAX_DELAY) 안에 들어온 백그라운드 분석 요청을 최대 BATCH_MAX_SIZE편까지 모아
+# 한 번의 Chat Completions 요청으로 보낸다. 시스템 프롬프트와 왕복 지연을 여러 글이 나눠 쓴다.
+# -----------------------------------------------------------------------
+# BATCH_MAX=1이면 배칭 없이 글마다 따로 요청한다
+BATCH_MAX_SIZE = max(1, int(os.getenv("BATCH_MAX", "8")))
+BATCH_MAX_DELAY = int(os.getenv("BATCH_WINDOW_MS", "300")) / 1000  # 초
+# 동시에 진행할 수 있는 배치 요청 수
+BATCH_MAX_IN_FLIGHT = 4
+
+
+class _BatchDispatcher:
+    """submit()으로 받은 글을 모아 call_openai_for_feedback_batch로 평가하고 Future로 결과를 돌려준다"""
+
+    def __init__(self, max_size: int, max_delay: float, max_in_flight: int):
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._max_in_flight = max_in_flight
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._pool = None
+
+    def submit(self, student_text: str) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((student_text, future))
+        return future
+
+    def _ensure_started(self) -> None:
+        # import 시점이 아니라 첫 요청 때 스레드를 띄운다 (gunicorn fork 이후에 생성되도록)
+        if self._pool is not None:
+            return
+        with self._start_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_in_flight,
+                    thread_name_prefix="openai-batch",
+                )
+                threading.Thread(target=self._collect_loop, name="openai-batcher", daemon=True).start()
+
+    def _collect_loop(self) -> None:
+        while True:
+            batch = _collect_batch(self._queue, self._max_size, self._max_delay)
+            self._pool.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: list) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            results = call_openai_for_feedback_batch(texts, ACHIEVEMENT_2015, TEXT_DESCRIPTION)
+        except Exception as e:
+            # 네트워크 오류(OSError)는 글마다 다시 보내도 결과가 같으므로 그대로 전달한다
+            if len(batch) == 1 or isinstance(e, OSError):
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+            # 배치 응답 형식이 깨졌으면 글마다 따로 다시 요청해서 한 편의 실패가 전체로 번지지 않게 한다.
+            # 차례로 보내면 마지막 글이 몇 배로 기다리므로 풀에 나눠 동시에 보낸다.
+            logger.warning(f"[배치 실패 → 개별 재요청] {len(batch)}편: {type(e).__name__}: {e}")
+            for text, future in batch:
+                self._pool.submit(self._dispatch_single, text, future)
+            return
+        logger.info(f"[배치 평가 완료] {len(batch)}편")
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _dispatch_single(self, text: str, future: Future) -> None:
+        try:
+            future.set_result(call_openai_for_feedback(text, ACHIEVEMENT_2015, TEXT_DESCRIPTION))
+        except Exception as e:
+            future.set_exception(e)
+
+
+_batcher = _BatchDispatcher(BATCH_MAX_SIZE, BATCH_MAX_DELAY, BATCH_MAX_IN_FLIGHT)
+
+
+def _new_process_id(now: datetime) -> str:
+    return f"proc_{now.strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(3)}"
+
+
+# 평가 영역과 모델이 점수를 빠뜨렸을 때 쓰는 기본값 (이 순서대로 저장된다)
+_SCORE_DEFAULTS = {"vocabulary": 3, "grammar": 3, "logic": 3, "empathy": 4}
+
+
+def _coerce_scores(scores) -> dict:
+    """모델이 준 scores를 영역별 1-5 정수로 맞춘다. 빠졌거나 정수로 바꿀 수 없으면 기본값을 쓴다"""
+    if not isinstance(scores, dict):
+        scores = {}
+    coerced = {}
+    for name, default in _SCORE_DEFAULTS.items():
+        try:
+            value = int(scores.get(name, default))
+        except (TypeError, ValueError):
+            value = default
+        coerced[name] = min(max(value, 1), 5)
+    return coerced
+
+
 def build_schema(
     student_text: str,
     feedback_text: str,
@@ -242,10 +899,14 @@ def build_schema(
     scores: dict,
     achievement_2015: str,
     text_description: str,
+    process_id: str = None,
 ):
-    now_iso = datetime.utcnow().isoformat() + "Z"
-    process_id = f"proc_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
-    essay_id = f"ESSAY_{uuid4().hex[:8]}"
+    # 시각은 한 번만 읽어서 ISO 문자열과 process_id를 함께 만든다.
+    # /submit처럼 접수 때 이미 process_id를 발급했으면 그것을 그대로 쓴다.
+    now = datetime.utcnow()
+    now_iso = now.isoformat() + "Z"
+    process_id = process_id or _new_process_id(now)
+    essay_id = f"ESSAY_{secrets.token_hex(4)}"
 
     schema = {
         "metadata": {
@@ -276,10 +937,8 @@ def build_schema(
         },
         "evaluation": {
             "dimensions": {
-                "vocabulary": {"scale": 5, "value": int(scores.get("vocabulary", 3)), "comment": ""},
-                "grammar":    {"scale": 5, "value": int(scores.get("grammar", 3)),    "comment": ""},
-                "logic":      {"scale": 5, "value": int(scores.get("logic", 3)),      "comment": ""},
-                "empathy":    {"scale": 5, "value": int(scores.get("empathy", 4)),    "comment": ""},
+                name: {"scale": 5, "value": value, "comment": ""}
+                for name, value in _coerce_scores(scores).items()
             }
         },
         "ai_feedback": {
@@ -311,15 +970,11 @@ def get_essays():
     """DB(Supabase) 또는 로컬 파일에서 모든 학생 글 데이터를 반환"""
     try:
         if _is_supabase_configured():
-            essays = _supabase_select_all()
-        else:
-            out_path = get_schema_path()
-            with _schema_lock:
-                essays = _read_essays_locked(out_path)
-        return jsonify({"essays": essays})
+            return ojsonify({"essays": _supabase_select_all()}, compress=True)
+        return _json_response(_read_essays_body(), compress=True)
     except Exception as e:
         logger.error(f"GET /api/essays 오류: {e}\n{traceback.format_exc()}")
-        return jsonify({"error": str(e), "essays": []}), 500
+        return ojsonify({"error": str(e), "essays": []}, 500)
 
 
 @app.post("/api/essays/approve")
@@ -329,68 +984,77 @@ def approve_essay():
         data = request.get_json(force=True)
         process_id = data.get("process_id")
         final_feedback = data.get("final_feedback", "").strip()
+        lesson_feedback = data.get("lesson_feedback", "")
 
         if not process_id:
-            return jsonify({"error": "process_id가 필요합니다."}), 400
+            return ojsonify({"error": "process_id가 필요합니다."}, 400)
         if not final_feedback:
-            return jsonify({"error": "최종 피드백이 비어있습니다."}), 400
+            return ojsonify({"error": "최종 피드백이 비어있습니다."}, 400)
 
         now_iso = datetime.utcnow().isoformat() + "Z"
 
         if _is_supabase_configured():
             # Supabase에서 해당 레코드 조회
             url = f"{SUPABASE_URL}/rest/v1/essays?process_id=eq.{process_id}&select=data"
-            resp = requests.get(url, headers=_supabase_headers(), timeout=30)
+            resp = _supabase_session.get(url, headers=_supabase_headers(), timeout=30)
             resp.raise_for_status()
-            rows = resp.json()
+            rows = _loads(resp.content)
             if not rows:
-                return jsonify({"error": "해당 process_id를 가진 데이터를 찾을 수 없습니다."}), 404
+                return ojsonify({"error": "해당 process_id를 가진 데이터를 찾을 수 없습니다."}, 404)
 
             essay = rows[0]["data"]
-            _apply_approval(essay, final_feedback, data.get("lesson_feedback", ""), now_iso)
-            _supabase_update(process_id, essay)
+            ai_draft_feedback = essay.get("ai_feedback", {}).get("ai_draft_feedback", "")
+            patch = _approval_patch(final_feedback, lesson_feedback, now_iso, ai_draft_feedback)
+            _supabase_update(process_id, _merge_patch(essay, patch))
         else:
-            out_path = get_schema_path()
             with _schema_lock:
-                essays = _read_essays_locked(out_path)
-                essay_index = next(
-                    (i for i, e in enumerate(essays)
-                     if e.get("process", {}).get("process_id") == process_id),
-                    None
+                row = _select_essay_fields_locked(process_id, "$.ai_feedback.ai_draft_feedback")
+                if row is None:
+                    return ojsonify({"error": "해당 process_id를 가진 데이터를 찾을 수 없습니다."}, 404)
+                _patch_essay_locked(
+                    process_id,
+                    _approval_patch(final_feedback, lesson_feedback, now_iso, row[0]),
                 )
-                if essay_index is None:
-                    return jsonify({"error": "해당 process_id를 가진 데이터를 찾을 수 없습니다."}), 404
-                _apply_approval(essays[essay_index], final_feedback, data.get("lesson_feedback", ""), now_iso)
-                _write_essays_locked(out_path, essays)
 
         logger.info(f"[승인 완료] process_id={process_id}")
-        return jsonify({"success": True, "message": "승인 완료", "process_id": process_id, "status": "completed"})
+        return ojsonify({"success": True, "message": "승인 완료", "process_id": process_id, "status": "completed"})
 
     except Exception as e:
         logger.error(f"POST /api/essays/approve 오류: {e}\n{traceback.format_exc()}")
-        return jsonify({"error": str(e)}), 500
-
+        return ojsonify({"error": str(e)}, 500)
 
-def _apply_approval(essay: dict, final_feedback: str, lesson_feedback: str, now_iso: str) -> None:
-    """essay 딕셔너리에 승인 데이터를 in-place로 적용"""
-    essay["process"]["status"] = "completed"
-    essay["process"]["current_step"] = 5
-    essay["metadata"]["updated_at"] = now_iso
 
-    if "teacher_correction" not in essay:
-        essay["teacher_correction"] = {}
-    essay["teacher_correction"].update({
-        "teacher_id": "t_001",
-        "corrected_at": now_iso,
-        "teacher_final_feedback": final_feedback,
-        "ai_draft_feedback": essay.get("ai_feedback", {}).get("ai_draft_feedback", ""),
-    })
+def _merge_patch(target: dict, patch: dict) -> dict:
+    """
+    JSON Merge Patch(RFC 7396)를 적용한 새 dict를 반환 (SQLite json_patch와 같은 규칙).
+    target은 수정하지 않고 patch가 닿는 경로만 복사한다.
+    """
+    result = dict(target)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict):
+            child = result.get(key)
+            result[key] = _merge_patch(child if isinstance(child, dict) else {}, value)
+        else:
+            result[key] = value
+    return result
 
-    essay["lesson_feedback"] = lesson_feedback.strip()
 
-    if "ai_feedback" in essay:
-        essay["ai_feedback"]["final_feedback"] = final_feedback
-        essay["ai_feedback"]["approved_at"] = now_iso
+def _approval_patch(final_feedback: str, lesson_feedback: str, now_iso: str, ai_draft_feedback) -> dict:
+    """교사 승인 시 바뀌는 필드만 담은 merge patch (null은 삭제를 뜻하므로 빈 문자열로 바꾼다)"""
+    return {
+        "process": {"status": "completed", "current_step": 5},
+        "metadata": {"updated_at": now_iso},
+        "teacher_correction": {
+            "teacher_id": "t_001",
+            "corrected_at": now_iso,
+            "teacher_final_feedback": final_feedback,
+            "ai_draft_feedback": ai_draft_feedback or "",
+        },
+        "lesson_feedback": lesson_feedback.strip(),
+        "ai_feedback": {"final_feedback": final_feedback, "approved_at": now_iso},
+    }
 
 
 @app.post("/api/essays/send-report")
@@ -402,81 +1066,59 @@ def send_report():
         report_type = data.get("report_type")
 
         if not process_id:
-            return jsonify({"error": "process_id가 필요합니다."}), 400
+            return ojsonify({"error": "process_id가 필요합니다."}, 400)
         if report_type not in ["student", "parent"]:
-            return jsonify({"error": "report_type은 'student' 또는 'parent'여야 합니다."}), 400
+            return ojsonify({"error": "report_type은 'student' 또는 'parent'여야 합니다."}, 400)
 
         now_iso = datetime.utcnow().isoformat() + "Z"
 
         if _is_supabase_configured():
             url = f"{SUPABASE_URL}/rest/v1/essays?process_id=eq.{process_id}&select=data"
-            resp = requests.get(url, headers=_supabase_headers(), timeout=30)
+            resp = _supabase_session.get(url, headers=_supabase_headers(), timeout=30)
             resp.raise_for_status()
-            rows = resp.json()
+            rows = _loads(resp.content)
             if not rows:
-                return jsonify({"error": "해당 process_id를 가진 데이터를 찾을 수 없습니다."}), 404
+                return ojsonify({"error": "해당 process_id를 가진 데이터를 찾을 수 없습니다."}, 404)
 
             essay = rows[0]["data"]
-            if "report_status" not in essay:
-                essay["report_status"] = {}
-            if report_type == "student":
-                essay["report_status"]["student_sent"] = True
-                essay["report_status"]["student_sent_at"] = now_iso
-            else:
-                essay["report_status"]["parent_sent"] = True
-                essay["report_status"]["parent_sent_at"] = now_iso
-            essay["metadata"]["updated_at"] = now_iso
-            _supabase_update(process_id, essay)
+            _supabase_update(process_id, _merge_patch(essay, _report_sent_patch(report_type, now_iso)))
         else:
-            out_path = get_schema_path()
             with _schema_lock:
-                essays = _read_essays_locked(out_path)
-                essay_index = next(
-                    (i for i, e in enumerate(essays)
-                     if e.get("process", {}).get("process_id") == process_id),
-                    None
-                )
-                if essay_index is None:
-                    return jsonify({"error": "해당 process_id를 가진 데이터를 찾을 수 없습니다."}), 404
-                if "report_status" not in essays[essay_index]:
-                    essays[essay_index]["report_status"] = {}
-                if report_type == "student":
-                    essays[essay_index]["report_status"]["student_sent"] = True
-                    essays[essay_index]["report_status"]["student_sent_at"] = now_iso
-                else:
-                    essays[essay_index]["report_status"]["parent_sent"] = True
-                    essays[essay_index]["report_status"]["parent_sent_at"] = now_iso
-                essays[essay_index]["metadata"]["updated_at"] = now_iso
-                _write_essays_locked(out_path, essays)
+                found = _patch_essay_locked(process_id, _report_sent_patch(report_type, now_iso))
+            if not found:
+                return ojsonify({"error": "해당 process_id를 가진 데이터를 찾을 수 없습니다."}, 404)
 
         logger.info(f"[리포트 발송] process_id={process_id} type={report_type}")
-        return jsonify({"success": True, "message": f"{report_type} 리포트 발송 완료", "process_id": process_id})
+        return ojsonify({"success": True, "message": f"{report_type} 리포트 발송 완료", "process_id": process_id})
 
     except Exception as e:
         logger.error(f"POST /api/essays/send-report 오류: {e}\n{traceback.format_exc()}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
+
+
+def _report_sent_patch(report_type: str, now_iso: str) -> dict:
+    """리포트 발송 시 바뀌는 필드만 담은 merge patch"""
+    return {
+        "report_status": {f"{report_type}_sent": True, f"{report_type}_sent_at": now_iso},
+        "metadata": {"updated_at": now_iso},
+    }
 
 
 def process_essay_in_background(text: str, process_id: str):
-    """백그라운드 스레드에서 AI 분석 후 DB에 저장"""
+    """백그라운드 작업 풀(_executor)에서 AI 분석 후 DB에 저장"""
     logger.info(f"[백그라운드 시작] process_id={process_id}")
     try:
-        achievement_2015, text_description = load_achievement_standard_and_desc(STANDARD_PATH)
-        feedback_text, achievement_explanation, revised_text, scores = call_openai_for_feedback(
-            student_text=text,
-            achievement_2015=achievement_2015,
-            text_description=text_description,
-        )
+        feedback_text, achievement_explanation, revised_text, scores = _batcher.submit(text).result()
         schema = build_schema(
             student_text=text,
             feedback_text=feedback_text,
             achievement_explanation=achievement_explanation,
             revised_text=revised_text,
             scores=scores,
-            achievement_2015=achievement_2015,
-            text_description=text_description,
+            achievement_2015=ACHIEVEMENT_2015,
+            text_description=TEXT_DESCRIPTION,
+            process_id=process_id,
         )
-        schema["process"]["process_id"] = process_id
         _append_essay_safe(schema)
     except Exception as e:
         logger.error(
@@ -494,23 +1136,102 @@ def submit():
         text = (data.get("text") or "").strip()
 
         if not text:
-            return jsonify({"error": "텍스트가 비어 있습니다."}), 400
+            return ojsonify({"error": "텍스트가 비어 있습니다."}, 400)
 
-        process_id = f"proc_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
+        process_id = _new_process_id(datetime.utcnow())
         logger.info(f"[제출 접수] process_id={process_id} 글 길이={len(text)}자")
 
-        thread = threading.Thread(
-            target=process_essay_in_background,
-            args=(text, process_id),
-            daemon=True,
-        )
-        thread.start()
+        _executor.submit(process_essay_in_background, text, process_id)
 
-        return jsonify({"success": True, "message": "제출 완료", "process_id": process_id})
+        # 분석은 아직 끝나지 않았으므로 202 Accepted로 접수만 알린다
+        return ojsonify({"success": True, "message": "제출 완료", "process_id": process_id}, 202)
 
     except Exception as e:
         logger.error(f"POST /submit 오류: {e}\n{traceback.format_exc()}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
+
+
+def _sse_event(event: str, data: dict) -> bytes:
+    """text/event-stream 이벤트 하나 (data는 한 줄 JSON)"""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + _dumps(data) + b"\n\n"
+
+
+def _save_streamed_feedback(text: str, raw_content: str) -> dict:
+    """스트리밍으로 다 모은 모델 응답을 파싱해 저장하고 스키마를 반환"""
+    feedback_text, achievement_explanation, revised_text, scores = _unpack_feedback(
+        _parse_model_json(raw_content)
+    )
+    schema = build_schema(
+        student_text=text,
+        feedback_text=feedback_text,
+        achievement_explanation=achievement_explanation,
+        revised_text=revised_text,
+        scores=scores,
+        achievement_2015=ACHIEVEMENT_2015,
+        text_description=TEXT_DESCRIPTION,
+    )
+    _append_essay_safe(schema)
+    return schema
+
+
+@app.post("/submit/stream")
+def submit_stream():
+    """
+    글을 받아 AI 응답이 생성되는 대로 SSE(text/event-stream)로 흘려보낸다.
+
+    이벤트 (data는 모두 한 줄 JSON):
+    - delta: {"content": "..."} — 모델이 만드는 JSON 객체 텍스트의 조각을 그대로 보낸다.
+      피드백 문장이 아니라 '{"feedback":"' 같은 JSON 조각이므로, 화면에는 진행 표시 정도로만 쓰고
+      결과는 done 이후 /api/essays에서 조회한다 (조각을 모두 이어 붙이면 응답 JSON 객체 전체가 된다).
+    - done: {"success": true, "process_id": ...} — 응답 전체를 파싱해 DB에 저장한 뒤 보낸다.
+    - error: {"error": "..."} — 호출/파싱/저장 실패. 이 경우 저장되지 않는다.
+
+    클라이언트가 스트림 도중 연결을 끊어도 남은 응답을 마저 받아 저장한다 (done 이벤트만 못 받는다).
+    """
+    try:
+        data = request.get_json(force=True)
+        text = (data.get("text") or "").strip()
+
+        if not text:
+            return ojsonify({"error": "텍스트가 비어 있습니다."}, 400)
+    except Exception as e:
+        logger.error(f"POST /submit/stream 오류: {e}\n{traceback.format_exc()}")
+        return ojsonify({"error": str(e)}, 500)
+
+    def generate():
+        chunks = _iter_chat_completion(
+            _single_system_prompt(ACHIEVEMENT_2015),
+            _SINGLE_USER_PROMPT(student_text=text, text_description=TEXT_DESCRIPTION),
+            _MAX_TOKENS_PER_ESSAY,
+        )
+        parts = []
+        try:
+            for content in chunks:
+                parts.append(content)
+                yield _sse_event("delta", {"content": content})
+            # JSON은 스트림이 끝난 뒤 모은 전체 본문으로 한 번만 파싱한다
+            schema = _save_streamed_feedback(text, "".join(parts))
+        except GeneratorExit:
+            # 클라이언트가 끊으면 서버가 generator를 닫는다. 제출이 사라지지 않도록 남은 응답을 받아 저장한다
+            logger.warning(f"[스트림 끊김] 글 길이={len(text)}자, 받은 조각 {len(parts)}개 → 나머지를 받아 저장")
+            try:
+                parts.extend(chunks)
+                schema = _save_streamed_feedback(text, "".join(parts))
+                logger.info(f"[스트림 끊김 후 저장] process_id={schema['process']['process_id']}")
+            except Exception as e:
+                logger.error(f"POST /submit/stream 끊김 후 저장 실패: {e}\n{traceback.format_exc()}")
+            return
+        except Exception as e:
+            logger.error(f"POST /submit/stream 스트리밍 오류: {e}\n{traceback.format_exc()}")
+            yield _sse_event("error", {"error": str(e)})
+            return
+        yield _sse_event("done", {"success": True, "message": "제출 완료", "process_id": schema["process"]["process_id"]})
+
+    resp = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    # 프록시가 응답을 모아 두지 않고 조각마다 바로 내보내도록 한다
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 
 @app.post("/analyze")
@@ -521,13 +1242,12 @@ def analyze():
         text = (data.get("text") or "").strip()
 
         if not text:
-            return jsonify({"error": "텍스트가 비어 있습니다."}), 400
+            return ojsonify({"error": "텍스트가 비어 있습니다."}, 400)
 
-        achievement_2015, text_description = load_achievement_standard_and_desc(STANDARD_PATH)
         feedback_text, achievement_explanation, revised_text, scores = call_openai_for_feedback(
             student_text=text,
-            achievement_2015=achievement_2015,
-            text_description=text_description,
+            achievement_2015=ACHIEVEMENT_2015,
+            text_description=TEXT_DESCRIPTION,
         )
         schema = build_schema(
             student_text=text,
@@ -535,15 +1255,15 @@ def analyze():
             achievement_explanation=achievement_explanation,
             revised_text=revised_text,
             scores=scores,
-            achievement_2015=achievement_2015,
-            text_description=text_description,
+            achievement_2015=ACHIEVEMENT_2015,
+            text_description=TEXT_DESCRIPTION,
         )
         _append_essay_safe(schema)
-        return jsonify({"success": True, "message": "제출 완료", "process_id": schema["process"]["process_id"]})
+        return ojsonify({"success": True, "message": "제출 완료", "process_id": schema["process"]["process_id"]})
 
     except Exception as e:
         logger.error(f"POST /analyze 오류: {e}\n{traceback.format_exc()}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
 
 
 if __name__ == "__main__":